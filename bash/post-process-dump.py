@@ -23,7 +23,8 @@ Everything else is written as-is, including regular code comments:
 
 The script never loads the whole file into memory.
 It reads line by line and only keeps one versioned comment block
-in memory at a time.
+in memory at a time. The dump is processed as raw bytes (no UTF-8
+decoding/encoding), so the data is written back exactly as it was read.
 
 Additionally:
   * Optionally, if a table metadata TSV is provided, normalize
@@ -49,8 +50,14 @@ Usage:
 
 import os
 import re
+import csv
 import sys
+import mmap
+import time
+import queue
 import argparse
+import threading
+import contextlib
 from pathlib import Path
 
 # Safety cap for collecting multi-line "/*!<digits> ... */" blocks.
@@ -62,9 +69,55 @@ from pathlib import Path
 # appending lines and consume huge amounts of memory/time.
 MAX_COMMENT_CHARS = 16 * 1024 * 1024  # 16 MiB
 
+# Buffer size for the input/output dump streams.
+#
+# The default io buffer is only 8 KiB, which turns a multi-GB dump into
+# hundreds of thousands of read()/write() syscalls. A few MiB per syscall keeps
+# the streaming loop bound by the actual processing instead of the I/O calls.
+IO_BUFFER_SIZE = 4 * 1024 * 1024  # 4 MiB
+
+# Processed fragments are collected in memory and handed to the output file
+# in one write() call once they reach this size (similar to mysqldump's own
+# net_buffer_length), instead of one write() per emitted fragment.
+OUTPUT_FLUSH_SIZE = 1024 * 1024  # 1 MiB
+
+# Maximum number of output blocks (each up to a few MiB) waiting for the
+# background writer thread, see background_writer().
+WRITE_QUEUE_SIZE = 8
+
+# Minimal delay between two progress updates on stderr, in seconds.
+# On a fast disk every 1% step may take only a few milliseconds, and redrawing
+# the progress line more often than a few times per second is useless.
+PROGRESS_INTERVAL = 0.25
+
+# Block comment delimiters, scanned by find_conditional_end().
+COMMENT_TOKEN_RE = re.compile(rb"/\*|\*/")
+
+# Version digits after "/*!".
+DIGITS_RE = re.compile(rb"[0-9]+")
+
+# Run of blanks in front of a potential versioned comment.
+LEADING_BLANKS_RE = re.compile(rb"[ \t]*")
+
+# First non-blank bytes of a line that may still be a "SET time_zone" statement
+# (TIME_ZONE_UTC_RE skips \r, \v and \f as leading whitespace as well).
+MAYBE_SET_LEAD_BYTES = b"Ss\r\x0b\x0c"
+
+# Start of the next line that may need processing when no transformation is
+# requested: its first non-blank byte is "/" (a possible versioned comment) or
+# one of MAYBE_SET_LEAD_BYTES. Matched on the preceding newline, so the regex
+# engine can skip ahead with a fast literal search.
+LINE_NEEDS_PROCESSING_RE = re.compile(rb"\n[ \t]*[/Ss\r\x0b\x0c]")
+
+# Start of the next line that may open a versioned comment (first non-blank
+# byte is "/"). All other lines are passed to write_out() whole, so a run of
+# them can be handed over as one chunk.
+LINE_MAY_OPEN_COMMENT_RE = re.compile(rb"\n[ \t]*/")
+
+
 def find_conditional_end(comment):
     """
-    Given a string that starts with a versioned comment:
+    Given a bytes string that starts with a versioned comment:
 
         /*!<digits>...
 
@@ -72,64 +125,79 @@ def find_conditional_end(comment):
     correctly handling nested regular block comments "/* ... */" inside.
 
     Returns:
-        (end_pos, digits_end)
+        (end_pos, digits_end, version)
 
         end_pos    - index where the closing "*/" starts (or None if not found)
         digits_end - index right after the version digits (i.e. start of inner content)
+        version    - the version number as int (None if there are no digits)
     """
-    n = len(comment)
     # comment[0:3] should be "/*!"
-    j = 3
-    while j < n and comment[j].isdigit():
-        j += 1
-    digits_end = j
-    version_str = comment[3:digits_end]
-    if not version_str:
-        return None, None
-
-    depth = 0
-    k = digits_end
-    end_pos = None
-
-    while k < n - 1:
-        two = comment[k:k + 2]
-
-        if two == "/*":
-            # nested regular block comment
-            depth += 1
-            k += 2
-            continue
+    m = DIGITS_RE.match(comment, 3)
+    if m is None:
+        return None, None, None
+    digits_end = m.end()
 
-        if two == "*/":
-            if depth == 0:
-                end_pos = k
-                break
-            else:
-                depth -= 1
-                k += 2
-                continue
+    end_pos, _ = find_comment_close(comment, digits_end)
+    return end_pos, digits_end, int(m.group())
 
-        k += 1
 
-    return end_pos, digits_end
+def find_comment_close(text, pos=0, depth=0):
+    """
+    Scan `text` from `pos` for the "*/" that closes the current comment,
+    when `depth` nested regular block comments "/* ... */" are still open.
+
+    Returns:
+        (end_pos, depth)
+
+        end_pos - index where the closing "*/" starts (or None if not found)
+        depth   - nesting depth reached at the end of `text`, so a multi-line
+                  comment can be scanned line by line
+    """
+    if depth == 0:
+        # Fast path: versioned comments practically never contain nested
+        # comments, so the first "*/" is the closing one unless a "/*" starts
+        # before it (or overlaps it, as in "/*/").
+        close = text.find(b"*/", pos)
+        if close != -1 and text.find(b"/*", pos, close + 1) == -1:
+            return close, 0
+
+    # Jump from one "/*" / "*/" token to the next instead of stepping
+    # through the comment one character at a time.
+    for m in COMMENT_TOKEN_RE.finditer(text, pos):
+        if m.group() == b"/*":
+            # nested regular block comment
+            depth += 1
+        elif depth == 0:
+            return m.start(), 0
+        else:
+            depth -= 1
+
+    return None, depth
 
 
-def report_progress(processed_bytes, total_size, last):
+def report_progress(processed_bytes, total_size, step, last_time):
     """
     Print progress to stderr on a single line using carriage return.
-    Returns the updated 'last' value.
+    last_time is the time.monotonic() of the previous update (0.0 if none).
+
+    Returns (next_offset, last_time): the byte offset at which the next update
+    is due (callers skip the call entirely until processed_bytes reaches it)
+    and the time of the last update, to be passed to the next call.
     """
-    if total_size <= 0:
-        percent = 100.0
+    if total_size <= 0 or processed_bytes >= total_size:
+        percent = 100
     else:
-        percent = (processed_bytes / float(total_size)) * 100.0
+        percent = processed_bytes * 100 // total_size
 
-    if percent - last >= 1.0 or percent == 100.0:
-        sys.stderr.write("\r{0:5.1f}%...".format(percent))
+    # The wall clock is only checked once per 1% step, not per line.
+    now = time.monotonic()
+    if percent == 100 or now - last_time >= PROGRESS_INTERVAL:
+        sys.stderr.write("\r{0:3d}%...".format(percent))
+        # "\r" does not flush line-buffered stderr by itself.
         sys.stderr.flush()
-        return percent
+        last_time = now
 
-    return last
+    return processed_bytes + step, last_time
 
 
 # --- Table metadata loading and CREATE TABLE enhancement ----------------------
@@ -144,7 +212,7 @@ def load_table_metadata(tsv_path):
         WHERE TABLE_SCHEMA IN (...);
 
     Returns:
-        (meta, default_schema)
+        (meta, default_schema, tables_by_name)
 
         meta: dict with keys "schema.table" and values:
               {
@@ -155,25 +223,34 @@ def load_table_metadata(tsv_path):
 
         default_schema: if all rows share the same TABLE_SCHEMA,
                         this schema name is returned, otherwise None.
+
+        tables_by_name: dict mapping a bare table name to the list of
+                        "schema.table" keys with that name. Used to resolve
+                        CREATE TABLE statements when no schema is known,
+                        without scanning all of meta for every table.
     """
     meta = {}
     schemas = set()
+    tables_by_name = {}
 
-    if not os.path.isfile(tsv_path):
+    # Just try to open it: a separate isfile() check costs another stat().
+    # Any OSError (missing file, a directory, no permission; on Windows opening
+    # a directory raises PermissionError) means there is no usable TSV.
+    try:
+        f = open(tsv_path, "r", encoding="utf-8", errors="replace", newline="")
+    except OSError:
         sys.stderr.write(
             "\n[WARN] Table metadata TSV not found: {0}. "
             "CREATE TABLE enhancement will be skipped.\n".format(tsv_path)
         )
-        return meta, None
+        return meta, None, tables_by_name
 
     sys.stderr.write("\nLoading table metadata from '{0}'...\n".format(tsv_path))
 
-    with open(tsv_path, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            line = line.rstrip("\n\r")
-            if not line:
-                continue
-            parts = line.split("\t")
+    with f:
+        # csv splits the rows in C. QUOTE_NONE keeps quote characters literal,
+        # exactly like the mysql client's batch (TSV) output.
+        for parts in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
             if len(parts) < 5:
                 continue
 
@@ -188,17 +265,17 @@ def load_table_metadata(tsv_path):
                 eng = None
 
             # Normalize row_format
-            rf = (row_format or "").strip()
-            if not rf or rf.upper() == "NULL":
+            rf = (row_format or "").strip().upper()
+            if not rf or rf == "NULL":
                 rf = None
-            else:
-                rf = rf.upper()
 
             # Normalize collation
             tc = (table_collation or "").strip()
             if not tc or tc.upper() == "NULL":
                 tc = None
 
+            if key not in meta:
+                tables_by_name.setdefault(table, []).append(key)
             meta[key] = {
                 "engine": eng,
                 "row_format": rf,
@@ -213,15 +290,63 @@ def load_table_metadata(tsv_path):
     if default_schema:
         msg += " in schema {0!r}".format(default_schema)
     sys.stderr.write(msg + "\n")
-    return meta, default_schema
+    return meta, default_schema, tables_by_name
 
 
 # Precompiled regexes for CREATE TABLE / USE detection
-USE_DB_RE = re.compile(r'^\s*USE\s+`([^`]+)`;', re.IGNORECASE)
+USE_DB_RE = re.compile(rb'^\s*USE\s+`([^`]+)`;', re.IGNORECASE)
 CREATE_TABLE_RE = re.compile(
-    r'^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`([^`]+)`', re.IGNORECASE
+    rb'^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`([^`]+)`', re.IGNORECASE
 )
-ENGINE_LINE_RE = re.compile(r'\)\s+ENGINE\s*=', re.IGNORECASE)
+ENGINE_LINE_RE = re.compile(rb'\)\s+ENGINE\s*=', re.IGNORECASE)
+
+# Table options already present after the closing ')' of CREATE TABLE,
+# all found in one scan. The first word of group 1, uppercased, identifies
+# the option: ENGINE, ROW_FORMAT, DEFAULT (CHARSET) or COLLATE.
+TABLE_OPTION_RE = re.compile(
+    rb'\b(ENGINE|ROW_FORMAT|DEFAULT\s+CHARSET|COLLATE)\s*=', re.IGNORECASE
+)
+
+LEADING_WS_RE = re.compile(rb'\s*')
+
+# Line breaks recognized by bytes.splitlines()
+LINE_BREAK_RE = re.compile(rb'\r\n|\r|\n')
+
+# Leading keywords of the lines tracked by enhance_create_table()
+STATEMENT_KEYWORDS = (b"USE", b"DROP", b"CREATE")
+
+# A lone "\r" line break (old Mac style), not part of "\r\n".
+BARE_CR_RE = re.compile(rb'\r(?!\n)')
+
+# Line break followed by a line that may start with one of STATEMENT_KEYWORDS
+# (leading whitespace other than a line break, then the keyword). The regex
+# engine finds a pattern that starts with a literal much faster than one that
+# starts with a character class, so the "\n" variant is used unless the text
+# has a bare "\r" line break (see BARE_CR_RE).
+STATEMENT_LINE_RE = re.compile(
+    rb'\n[ \t\x0b\x0c]*(?:USE|DROP|CREATE)', re.IGNORECASE
+)
+STATEMENT_LINE_CR_RE = re.compile(
+    rb'[\r\n][ \t\x0b\x0c]*(?:USE|DROP|CREATE)', re.IGNORECASE
+)
+
+
+def leading_keyword(line, length=16):
+    """
+    Return the first `length` characters of `line` after leading whitespace,
+    uppercased.
+
+    Lines are classified by their leading keyword (USE, DROP, CREATE...) before
+    running the full regexes, so a multi-MB INSERT line costs one short slice
+    instead of several regex attempts.
+    """
+    start = LEADING_WS_RE.match(line).end()
+    return line[start:start + length].upper()
+
+
+# Line break followed by a line that may be matched by USE_DB_RE or
+# CREATE_TABLE_RE (leading whitespace other than a line break, then the keyword).
+USE_OR_CREATE_LINE_RE = re.compile(rb'\n[^\S\n]*(?:USE|CREATE)', re.IGNORECASE)
 
 
 def dump_has_use_statement(path):
@@ -229,12 +354,19 @@ def dump_has_use_statement(path):
     Return True if the input dump selects a database via a 'USE `db`;' statement
     *before* any CREATE TABLE statement.
 
-    The file is scanned line by line and stops as soon as a relevant statement
-    is found, so it does not need to read the entire dump for this check.
+    The file is memory-mapped and the scan stops as soon as a relevant
+    statement is found, so it does not need to read the entire dump for this
+    check. Only lines that start with USE or CREATE are looked at; the others
+    are skipped with a single regex search over the mapping.
     """
     try:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            for line in f:
+        with open(path, "rb") as f, \
+             mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            start = 0
+            while start < size:
+                end = mm.find(b"\n", start) + 1 or size
+                line = mm[start:end]
                 # A USE statement before any DDL means the dump is already safe.
                 if USE_DB_RE.search(line):
                     return True
@@ -242,8 +374,14 @@ def dump_has_use_statement(path):
                 # database yet, and such statements would fail on import.
                 if CREATE_TABLE_RE.search(line):
                     return False
-    except OSError:
+                # Jump to the next line that may start with USE or CREATE.
+                m = USE_OR_CREATE_LINE_RE.search(mm, end - 1)
+                if m is None:
+                    break
+                start = m.start() + 1
+    except (OSError, ValueError):
         # If we cannot read the file here, main() will fail later anyway.
+        # (An empty file cannot be mapped, and has no USE statement either.)
         return False
     # No USE and no relevant DDL found; treat as "no database selected".
     return False
@@ -251,22 +389,45 @@ def dump_has_use_statement(path):
 
 # Detect "DROP VIEW IF EXISTS `name`;"
 DROP_VIEW_RE = re.compile(
-    r'^\s*DROP\s+VIEW\s+IF\s+EXISTS\s+`([^`]+)`;',
+    rb'^\s*DROP\s+VIEW\s+IF\s+EXISTS\s+`([^`]+)`;',
     re.IGNORECASE
 )
 
 # Generic detection of DROP* statements for optional stripping.
 # Matches lines that begin (ignoring leading whitespace) with DROP ...;
-# and a special case for versioned comments like "/*!50001 DROP ... */".
-DROP_STMT_RE = re.compile(r'^\s*DROP\b', re.IGNORECASE)
-VERSIONED_DROP_STMT_RE = re.compile(r'^\s*/\*![0-9]+\s*DROP\b', re.IGNORECASE)
+# including versioned comments like "/*!50001 DROP ... */".
+DROP_STMT_RE = re.compile(rb'\s*(?:/\*![0-9]+\s*)?DROP\b', re.IGNORECASE)
+
+# Leading keywords of the lines DROP_STMT_RE can match
+DROP_STMT_KEYWORDS = (b"DROP", b"/*!")
+
+# Line break followed by a line that may start with one of DROP_STMT_KEYWORDS
+# (same "\n" and "\r" variants as STATEMENT_LINE_RE).
+DROP_STMT_LINE_RE = re.compile(rb'\n[ \t\x0b\x0c]*(?:DROP|/\*!)', re.IGNORECASE)
+DROP_STMT_LINE_CR_RE = re.compile(rb'[\r\n][ \t\x0b\x0c]*(?:DROP|/\*!)', re.IGNORECASE)
+
+
+def may_have_drop_stmt_line(text):
+    """
+    Cheap check whether any line of text starts with one of DROP_STMT_KEYWORDS,
+    i.e. whether DROP_STMT_RE has to be tried on its lines at all.
+    """
+    if leading_keyword(text).startswith(DROP_STMT_KEYWORDS):
+        return True
+    line_re = DROP_STMT_LINE_CR_RE if BARE_CR_RE.search(text) else DROP_STMT_LINE_RE
+    return line_re.search(text) is not None
+
 
 # Normalize "SET time_zone = 'UTC';" to "SET time_zone = '+00:00';"
 # Handles arbitrary spaces and one or more semicolons at the end of the line.
 TIME_ZONE_UTC_RE = re.compile(
-    r'(?im)^(\s*SET\s+time_zone\s*=\s*)([\'"])UTC\2(.*)$'
+    rb'(?im)^(\s*SET\s+time_zone\s*=\s*)([\'"])UTC\2(.*)$'
 )
 
+# Line break followed by a line TIME_ZONE_UTC_RE may match ("^" in multiline
+# mode only matches at the start of the text or after "\n").
+TIME_ZONE_LINE_RE = re.compile(rb'\n\s*SET\s+time_zone', re.IGNORECASE)
+
 
 def replace_utc_time_zone(text):
     """
@@ -276,7 +437,12 @@ def replace_utc_time_zone(text):
     This is done in a multiline-safe manner and should not affect data payloads,
     because the pattern is anchored to the beginning of the line.
     """
-    return TIME_ZONE_UTC_RE.sub(r"\1'+00:00'\3", text)
+    # Fast path for the common case (e.g. INSERT lines): if no line starts
+    # with SET time_zone, skip the substitution, which tries every line.
+    if not leading_keyword(text).startswith(b"SET") and \
+            TIME_ZONE_LINE_RE.search(text) is None:
+        return text
+    return TIME_ZONE_UTC_RE.sub(rb"\1'+00:00'\3", text)
 
 
 # --- DDL reproducibility helpers ---------------------------------------------
@@ -291,18 +457,54 @@ def replace_utc_time_zone(text):
 # identical output and Git diffs show only real DDL changes.
 
 # Normalize AUTO_INCREMENT to a deterministic value (0) for diff-friendly DDL.
-AUTO_INCREMENT_RE = re.compile(r"\bAUTO_INCREMENT=\d+\b", re.IGNORECASE)
+AUTO_INCREMENT_RE = re.compile(rb"\bAUTO_INCREMENT=\d+\b", re.IGNORECASE)
 
 # Normalize the trailing completion comment emitted by mysqldump.
-DUMP_COMPLETED_ON_RE = re.compile(r"(?m)^--\s+Dump\s+completed\s+on\s+.*$")
+DUMP_COMPLETED_ON_RE = re.compile(rb"(?m)^--\s+Dump\s+completed\s+on\s+.*$")
+
+# Both of the above, plus the time_zone normalization (TIME_ZONE_UTC_RE), as a
+# single alternation, so sanitize_ddl_for_reproducibility() replaces all of
+# them in one scan of the text. Scoped flags keep each pattern's own case
+# sensitivity (the completion comment is matched case-sensitively).
+DDL_VOLATILE_RE = re.compile(
+    rb"(?m)(?i:^(\s*SET\s+time_zone\s*=\s*)([\'\"])UTC\2(.*)$)"
+    rb"|(?i:\bAUTO_INCREMENT=\d+\b)"
+    rb"|^--\s+Dump\s+completed\s+on\s+.*$"
+)
+
+
+def replace_volatile_ddl_token(m):
+    """re.sub() callback for DDL_VOLATILE_RE."""
+    if m.group(1) is not None:
+        # SET time_zone = 'UTC' line; it may still carry an AUTO_INCREMENT value.
+        return m.group(1) + b"'+00:00'" + AUTO_INCREMENT_RE.sub(b"AUTO_INCREMENT=0", m.group(3))
+    if m.group().startswith(b"--"):
+        return b"-- Dump completed."
+    return b"AUTO_INCREMENT=0"
+
 
-def sanitize_ddl_for_reproducibility(text):
+# Formatting artifacts normalized by sanitize_ddl_for_reproducibility().
+VIEW_COMMENT_GAP_RE = re.compile(
+    rb"(-- Temporary view structure for view `[^`]+`\n(?:--.*\n)*)\n+(?=SET @saved_cs_client\b)"
+)
+SET_BLANK_LINES_RE = re.compile(rb"(SET\s+[^;]+;)\n\s*\n(?=SET\s+)")
+END_SPACED_DELIMITER_RE = re.compile(rb"(?m)^END;[ \t]*;[ \t]*\n(?=DELIMITER\b)")
+SEMICOLON_ONLY_LINE_RE = re.compile(rb"(?m)^;[ \t]*\n")
+COMMENT_END_DELIMITER_RE = re.compile(rb"\*/\s*DELIMITER\s*;;")
+BLANK_LINES_BEFORE_DELIMITER_RE = re.compile(rb"(?m)\n{2,}(?=DELIMITER\b)")
+TRAILING_WHITESPACE_RE = re.compile(rb"[ \t]+\n")
+LEADING_SPACE_STMT_RE = re.compile(rb"(?m)^ (?=(?:SET|VIEW|CREATE)\b)")
+EXCESS_NEWLINES_RE = re.compile(rb"\n{3,}")
+
+
+def sanitize_ddl_for_reproducibility(text, time_zone=False):
     """
     Normalize volatile parts of a schema-only dump so Git diffs are meaningful.
 
     Rules:
       - Replace any 'AUTO_INCREMENT=<number>' with 'AUTO_INCREMENT=0'
       - Replace '-- Dump completed on <timestamp>' with '-- Dump completed.'
+      - If time_zone is True, also apply replace_utc_time_zone() in the same pass
 
     Note: This function is intended for schema-only dumps. It is NOT enabled by
     default for full data dumps, because altering comment lines in data dumps can
@@ -312,44 +514,48 @@ def sanitize_ddl_for_reproducibility(text):
         return text
 
     # Make regex behavior deterministic across platforms/tools.
-    text = text.replace("\r\n", "\n")
+    text = text.replace(b"\r\n", b"\n")
 
-    # Reset AUTO_INCREMENT values to a stable constant.
-    text = AUTO_INCREMENT_RE.sub("AUTO_INCREMENT=0", text)
+    if time_zone:
+        # Reset AUTO_INCREMENT values to a stable constant, normalize mysqldump
+        # completion timestamp and SET time_zone = 'UTC', all in one pass.
+        text = DDL_VOLATILE_RE.sub(replace_volatile_ddl_token, text)
+    else:
+        # Reset AUTO_INCREMENT values to a stable constant.
+        text = AUTO_INCREMENT_RE.sub(b"AUTO_INCREMENT=0", text)
 
-    # Normalize mysqldump completion timestamp.
-    text = DUMP_COMPLETED_ON_RE.sub("-- Dump completed.", text)
+        # Normalize mysqldump completion timestamp.
+        text = DUMP_COMPLETED_ON_RE.sub(b"-- Dump completed.", text)
 
     # Fix gaps between 'Temporary view structure' comments and subsequent SET statements.
-    view_comment_pattern = r"(-- Temporary view structure for view `[^`]+`\n(?:--.*\n)*)\n+(?=SET @saved_cs_client\b)"
-    text = re.sub(view_comment_pattern, r"\1", text)
+    text = VIEW_COMMENT_GAP_RE.sub(rb"\1", text)
 
     # Remove blank lines between consecutive SET statements (minimal touch).
     # Keep it minimal to avoid touching other formatting.
-    text = re.sub(r"(SET\s+[^;]+;)\n\s*\n(?=SET\s+)", r"\1\n", text)
+    text = SET_BLANK_LINES_RE.sub(rb"\1\n", text)
 
     # Normalize mysqldump's "END; ;" into "END;;" (keep DELIMITER on next line).
-    text = re.sub(r"(?m)^END;[ \t]*;[ \t]*\n(?=DELIMITER\b)", "END;;\n", text)
+    text = END_SPACED_DELIMITER_RE.sub(b"END;;\n", text)
 
     # Remove lines containing only a semicolon (artifact).
-    text = re.sub(r"(?m)^;[ \t]*\n", "", text)
+    text = SEMICOLON_ONLY_LINE_RE.sub(b"", text)
 
     # Ensure delimiter starts on a new line after versioned comment closure.
-    text = re.sub(r"\*/\s*DELIMITER\s*;;", "*/\nDELIMITER ;;", text)
+    text = COMMENT_END_DELIMITER_RE.sub(b"*/\nDELIMITER ;;", text)
 
     # Remove blank lines right before DELIMITER directives to keep dumps stable.
     # mysqldump may randomly emit an extra empty line before DELIMITER ;; in routines/events.
-    text = re.sub(r"(?m)\n{2,}(?=DELIMITER\b)", "\n", text)
+    text = BLANK_LINES_BEFORE_DELIMITER_RE.sub(b"\n", text)
 
     # Strip trailing whitespace on each line (great for stable Git diffs).
-    text = re.sub(r"[ \t]+\n", "\n", text)
+    text = TRAILING_WHITESPACE_RE.sub(b"\n", text)
 
     # Remove exactly one leading space from common top-level mysqldump lines.
     # Avoid touching indented routine bodies (usually 2+ spaces).
-    text = re.sub(r"(?m)^ (?=(?:SET|VIEW|CREATE)\b)", "", text)
+    text = LEADING_SPACE_STMT_RE.sub(b"", text)
 
     # Collapse excessive newlines (3+ -> 2).
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = EXCESS_NEWLINES_RE.sub(b"\n\n", text)
 
     return text
 
@@ -362,20 +568,23 @@ def sanitize_ddl_for_reproducibility(text):
 # `inner` ends with a newline. To keep output deterministic and idempotent,
 # we attach exactly one leading ';' to the end of the last non-whitespace
 # character in `inner`, preserving trailing whitespace/newlines.
-def attach_leading_semicolon(inner_sql: str) -> str:
+TRAILING_WS_RE = re.compile(rb"(\s*)\Z")
+
+
+def attach_leading_semicolon(inner_sql: bytes) -> bytes:
     # Preserve trailing whitespace/newlines exactly as-is.
-    m_ws = re.search(r"(\s*)\Z", inner_sql)
-    trailing_ws = m_ws.group(1) if m_ws else ""
+    m_ws = TRAILING_WS_RE.search(inner_sql)
+    trailing_ws = m_ws.group(1) if m_ws else b""
     body = inner_sql[: len(inner_sql) - len(trailing_ws)] if trailing_ws else inner_sql
 
     # If the body already ends with ';', return unchanged.
-    if body.rstrip().endswith(";"):
+    if body.rstrip().endswith(b";"):
         return inner_sql
 
-    return body + ";" + trailing_ws
+    return body + b";" + trailing_ws
 
 
-def enhance_create_table(text, state, table_meta, default_schema):
+def enhance_create_table(text, state, table_meta, default_schema, tables_by_name=None):
     """
     Enhance CREATE TABLE statements in the given text chunk using table_meta.
 
@@ -385,17 +594,29 @@ def enhance_create_table(text, state, table_meta, default_schema):
 
     Only *adds* missing tokens; never removes existing ones
     (AUTO_INCREMENT, COMMENT, STATS_*, etc. are preserved).
+
+    tables_by_name is the index returned by load_table_metadata(); it is
+    used to find a table by name when the schema is unknown.
     """
     if not table_meta:
         return text
 
-    out_lines = []
+    # Fast path: write_out() is often called with a single line, and a line that
+    # does not start with USE, DROP or CREATE changes neither the text nor the
+    # state unless it belongs to an open CREATE TABLE.
+    if not state.get("in_create"):
+        m_nl = LINE_BREAK_RE.search(text)
+        if (m_nl is None or m_nl.end() == len(text)) and \
+                not leading_keyword(text).startswith(STATEMENT_KEYWORDS):
+            return text
+
+    out_parts = []
 
     # State fields:
     current_schema = state.get("current_schema") or default_schema
     in_create = state.get("in_create", False)
     current_table = state.get("current_table")
-    buffer = state.get("buffer", "")
+    buffer_parts = state.get("buffer_parts", [])
 
     # Remember that next CREATE TABLE for this name is a VIEW-shadow
     skip_for_table = state.get("skip_for_table")
@@ -403,36 +624,65 @@ def enhance_create_table(text, state, table_meta, default_schema):
         skip_for_table = set()
 
     def append_chunk(s):
-        out_lines.append(s)
+        out_parts.append(s)
+
+    # Lines outside of CREATE TABLE are passed through verbatim, so unless
+    # some line went into the CREATE TABLE buffer the output equals `text`.
+    # Otherwise they are emitted as slices of `text` that span all lines from
+    # `emit_from` up to the next CREATE TABLE, not appended one by one.
+    buffered = False
+    emit_from = 0
+
+    stmt_line_re = STATEMENT_LINE_CR_RE if BARE_CR_RE.search(text) else STATEMENT_LINE_RE
+
+    # Walk the lines by position (same line breaks as bytes.splitlines()).
+    pos = 0
+    n = len(text)
+    while pos < n:
+        if not in_create and pos:
+            # Outside of CREATE TABLE only USE, DROP and CREATE lines matter,
+            # and the skipped lines are emitted with the next slice anyway:
+            # jump straight to the next line that may start with a keyword.
+            m_kw = stmt_line_re.search(text, pos - 1)
+            if m_kw is None:
+                break
+            pos = m_kw.start() + 1
+        m_nl = LINE_BREAK_RE.search(text, pos)
+        line_start = pos
+        pos = m_nl.end() if m_nl else n
+        line = text[line_start:pos]
+
+        keyword = leading_keyword(line)
 
-    for line in text.splitlines(keepends=True):
         # Track USE `db`;
-        m_use = USE_DB_RE.match(line)
+        m_use = USE_DB_RE.match(line) if keyword.startswith(b"USE") else None
         if m_use:
-            current_schema = m_use.group(1)
+            current_schema = m_use.group(1).decode("utf-8", "replace")
 
         # Track "DROP VIEW IF EXISTS `x`;"
-        m_dv = DROP_VIEW_RE.match(line)
+        m_dv = DROP_VIEW_RE.match(line) if keyword.startswith(b"DROP") else None
         if m_dv:
-            skip_for_table.add(m_dv.group(1))
-            append_chunk(line)
+            skip_for_table.add(m_dv.group(1).decode("utf-8", "replace"))
+            if in_create:
+                # Emitted right away, ahead of the buffered CREATE TABLE.
+                append_chunk(line)
             continue
 
         if not in_create:
-            m_create = CREATE_TABLE_RE.match(line)
+            m_create = CREATE_TABLE_RE.match(line) if keyword.startswith(b"CREATE") else None
             if m_create:
+                append_chunk(text[emit_from:line_start])
                 in_create = True
-                current_table = m_create.group(1)
-                buffer = line
-                continue
-            else:
-                append_chunk(line)
-                continue
+                current_table = m_create.group(1).decode("utf-8", "replace")
+                buffer_parts = [line]
+                buffered = True
+            continue
         else:
-            buffer += line
+            buffer_parts.append(line)
+            buffered = True
             if ENGINE_LINE_RE.search(line):
                 # Got last line of CREATE TABLE
-                full = buffer
+                full = b"".join(buffer_parts)
 
                 # If this CREATE TABLE is the temporary one used for a VIEW — skip enhancement once
                 if current_table in skip_for_table:
@@ -440,7 +690,8 @@ def enhance_create_table(text, state, table_meta, default_schema):
                     skip_for_table.discard(current_table)
                     in_create = False
                     current_table = None
-                    buffer = ""
+                    buffer_parts = []
+                    emit_from = pos
                     continue
 
                 # Resolve metadata key (schema.table)
@@ -449,10 +700,13 @@ def enhance_create_table(text, state, table_meta, default_schema):
                     key = "{0}.{1}".format(schema_to_use, current_table)
                 else:
                     # No schema info: try by table name uniqueness
-                    matches = [
-                        k for k in table_meta.keys()
-                        if k.endswith(".{0}".format(current_table))
-                    ]
+                    if tables_by_name is not None:
+                        matches = tables_by_name.get(current_table, ())
+                    else:
+                        matches = [
+                            k for k in table_meta.keys()
+                            if k.endswith(".{0}".format(current_table))
+                        ]
                     if len(matches) == 1:
                         key = matches[0]
                     else:
@@ -479,10 +733,13 @@ def enhance_create_table(text, state, table_meta, default_schema):
                         charset = table_collation.split("_", 1)[0]
 
                         # --- augment last line tokens instead of replacing the whole line ---
-                        lines = full.splitlines(keepends=True)
-                        last_line = lines[-1]
+                        # The last line of the statement is the current `line`
+                        # (the last item of buffer_parts), so there is no
+                        # need to split the whole CREATE TABLE into lines again.
+                        last_line = line
+                        head = b"".join(buffer_parts[:-1])
 
-                        close_idx = last_line.find(")")
+                        close_idx = last_line.find(b")")
                         if close_idx == -1:
                             # Degenerate case: just emit as-is
                             append_chunk(full)
@@ -491,55 +748,52 @@ def enhance_create_table(text, state, table_meta, default_schema):
                             rest = last_line[close_idx + 1:]  # tokens part
 
                             # Parse existing tokens
-                            has_engine = re.search(r'\bENGINE\s*=', rest, re.I) is not None
-                            has_rowfmt = re.search(r'\bROW_FORMAT\s*=', rest, re.I) is not None
-                            has_def_charset = re.search(
-                                r'\bDEFAULT\s+CHARSET\s*=', rest, re.I
-                            ) is not None
-                            has_collate = re.search(
-                                r'\bCOLLATE\s*=', rest, re.I
-                            ) is not None
+                            present = {
+                                m.group(1).split()[0].upper()
+                                for m in TABLE_OPTION_RE.finditer(rest)
+                            }
+                            has_engine = b"ENGINE" in present
+                            # ROW_FORMAT is only added when metadata has one
+                            has_rowfmt = not row_format or b"ROW_FORMAT" in present
+                            has_def_charset = b"DEFAULT" in present
+                            has_collate = b"COLLATE" in present
 
                             additions = []
 
                             if not has_engine:
                                 additions.append(" ENGINE={0}".format(engine))
-                            if row_format and not has_rowfmt:
+                            if not has_rowfmt:
                                 additions.append(" ROW_FORMAT={0}".format(row_format))
                             if not has_def_charset:
                                 additions.append(" DEFAULT CHARSET={0}".format(charset))
-                                if not has_collate:
-                                    additions.append(" COLLATE={0}".format(table_collation))
-                            else:
-                                # DEFAULT CHARSET present; add COLLATE if missing
-                                if not has_collate:
-                                    additions.append(" COLLATE={0}".format(table_collation))
+                            if not has_collate:
+                                additions.append(" COLLATE={0}".format(table_collation))
 
                             # Detect newline at the end
-                            nl = ""
-                            if rest.endswith("\r\n"):
-                                nl = "\r\n"
+                            nl = b""
+                            if rest.endswith(b"\r\n"):
+                                nl = b"\r\n"
                                 rest_core = rest[:-2]
-                            elif rest.endswith("\n"):
-                                nl = "\n"
+                            elif rest.endswith(b"\n"):
+                                nl = b"\n"
                                 rest_core = rest[:-1]
                             else:
                                 rest_core = rest
 
                             # If rest_core already ends with ';', insert additions before it
-                            if rest_core.rstrip().endswith(";"):
-                                semi_pos = rest_core.rfind(";")
+                            added = "".join(additions).encode("utf-8")
+                            if rest_core.rstrip().endswith(b";"):
+                                semi_pos = rest_core.rfind(b";")
                                 new_rest_core = (
                                     rest_core[:semi_pos]
-                                    + "".join(additions)
+                                    + added
                                     + rest_core[semi_pos:]
                                 )
                             else:
-                                new_rest_core = rest_core + "".join(additions)
+                                new_rest_core = rest_core + added
 
-                            new_last_line = "{0}){1}{2}".format(prefix, new_rest_core, nl)
-                            lines[-1] = new_last_line
-                            full = "".join(lines)
+                            new_last_line = prefix + b")" + new_rest_core + nl
+                            full = head + new_last_line
                             append_chunk(full)
                 else:
                     # No metadata — keep as-is
@@ -548,27 +802,101 @@ def enhance_create_table(text, state, table_meta, default_schema):
                 # reset CREATE state
                 in_create = False
                 current_table = None
-                buffer = ""
+                buffer_parts = []
+                emit_from = pos
 
     # Update state
     state["current_schema"] = current_schema
     state["in_create"] = in_create
     state["current_table"] = current_table
-    state["buffer"] = buffer
+    state["buffer_parts"] = buffer_parts
     state["skip_for_table"] = skip_for_table
 
-    return "".join(out_lines)
+    if not buffered:
+        return text
+    if not in_create:
+        append_chunk(text[emit_from:])
+    return b"".join(out_parts)
 
 
 # --- Main stream processing ---------------------------------------------------
 
 
+@contextlib.contextmanager
+def background_writer(f):
+    """
+    Write to the binary file `f` from a separate thread.
+
+    Yields a function that queues a bytes object for writing and returns
+    immediately, so the next part of the dump is processed while the previous
+    one is being written (file writes release the GIL). At most
+    WRITE_QUEUE_SIZE blocks are queued, which also bounds the memory used.
+    A write error is re-raised by the next call or when the block exits.
+    """
+    pending = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    errors = []
+
+    def run():
+        while True:
+            data = pending.get()
+            if data is None:
+                return
+            if not errors:
+                try:
+                    f.write(data)
+                except Exception as e:
+                    errors.append(e)
+
+    def write(data):
+        if errors:
+            raise errors[0]
+        pending.put(data)
+
+    writer = threading.Thread(target=run, name="output-writer", daemon=True)
+    writer.start()
+    try:
+        yield write
+    finally:
+        pending.put(None)
+        writer.join()
+    if errors:
+        raise errors[0]
+
+
+@contextlib.contextmanager
+def open_dump_for_reading(path):
+    """
+    Open the input dump for reading as a memory map.
+
+    The kernel then pages the file in on demand (hinted as sequential access)
+    and readline() returns slices of the mapping, without first copying the
+    data into a read buffer. Falls back to a regular buffered file when the
+    file cannot be mapped (e.g. an empty file, or a multi-GB dump in a 32-bit
+    process).
+    """
+    with open(path, "rb", buffering=IO_BUFFER_SIZE) as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OverflowError, OSError):
+            mm = None
+        # Yield outside of the except block: errors raised while the dump is
+        # processed must not be chained to the failed mmap() call.
+        if mm is None:
+            yield f
+            return
+        with mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):  # Python 3.8+, not on Windows
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield mm
+
+
 def process_dump_stream(
     in_path,
     out_path,
     version_threshold=80000,
     table_meta=None,
     default_schema=None,
+    tables_by_name=None,
     db_name=None,
     no_drop=False,
     prepend_file=None,
@@ -603,6 +931,9 @@ def process_dump_stream(
             normalization steps.
         default_schema:
             Schema name to assume when the dump omits explicit qualifiers.
+        tables_by_name:
+            Optional table name -> ["schema.table", ...] index from
+            load_table_metadata(), used when no schema can be determined.
         db_name:
             Optional database name used for rewriting/normalization.
         no_drop:
@@ -635,7 +966,10 @@ def process_dump_stream(
 
     total_size = os.path.getsize(in_path)
     processed_bytes = 0
-    last_percent_reported = -1.0
+    # Progress is reported in whole percents: one integer comparison per line.
+    progress_step = max(total_size // 100, 1)
+    next_progress = 0
+    last_progress_time = 0.0
 
     sys.stderr.write(
         "Removing MySQL compatibility comments from '{0}' ({1:,} bytes)...\n".format(in_path, total_size)
@@ -646,52 +980,85 @@ def process_dump_stream(
         "current_schema": default_schema,
         "in_create": False,
         "current_table": None,
-        "buffer": "",
+        "buffer_parts": [],
         "skip_for_table": set(),
     }
 
+    # Pending output fragments (see OUTPUT_FLUSH_SIZE)
+    out_parts = []
+    out_size = 0
+
+    def flush_out():
+        """Hand all pending output fragments to the writer thread."""
+        nonlocal out_size
+        if out_parts:
+            write_output(b"".join(out_parts))
+            del out_parts[:]
+            out_size = 0
+
     def write_out(chunk):
         """Write chunk to fout, optionally enhancing CREATE TABLE,
         normalizing time_zone, optionally sanitizing DDL for reproducibility,
         and, if requested, stripping DROP* statements."""
+        nonlocal out_size
         if not chunk:
             return
-        enhanced = enhance_create_table(chunk, create_state, table_meta, default_schema)
-        # Normalize SET time_zone = 'UTC' to SET time_zone = '+00:00'
-        enhanced = replace_utc_time_zone(enhanced)
-
+        enhanced = enhance_create_table(
+            chunk, create_state, table_meta, default_schema, tables_by_name
+        )
         # If --ddl is enabled, normalize volatile DDL parts like AUTO_INCREMENT values
         # and mysqldump completion timestamps to keep schema dumps deterministic.
+        # The sanitizer also normalizes SET time_zone = 'UTC' to
+        # SET time_zone = '+00:00' in the same pass; otherwise do it here.
         if ddl:
-            enhanced = sanitize_ddl_for_reproducibility(enhanced)
+            enhanced = sanitize_ddl_for_reproducibility(enhanced, time_zone=True)
+        else:
+            enhanced = replace_utc_time_zone(enhanced)
 
-        if no_drop:
+        # A chunk may hold many lines: only split it if some line can be a DROP.
+        if no_drop and may_have_drop_stmt_line(enhanced):
             # Split into lines (keeping line endings) and drop any line whose first
             # non-whitespace token is DROP, including versioned comments like
             # "/*!50001 DROP VIEW ... */".
+            # The regex skips leading whitespace itself and is only tried on lines
+            # starting with one of DROP_STMT_KEYWORDS, matched at the line start
+            # rather than searched through it (INSERT lines can be huge).
             kept_lines = []
+            dropped = False
             for line in enhanced.splitlines(True):
-                stripped = line.lstrip()
-                if not stripped:
-                    kept_lines.append(line)
-                    continue
-                if VERSIONED_DROP_STMT_RE.match(stripped):
-                    continue
-                if DROP_STMT_RE.match(stripped):
+                if leading_keyword(line).startswith(DROP_STMT_KEYWORDS) and \
+                        DROP_STMT_RE.match(line):
+                    dropped = True
                     continue
                 kept_lines.append(line)
-            enhanced = "".join(kept_lines)
-            if not enhanced:
-                return
-
-        fout.write(enhanced)
-
-    with open(in_path, "r", encoding="utf-8", errors="replace") as fin, \
-         open(out_path, "w", encoding="utf-8", errors="replace") as fout:
-
-        fout.write(
-            "-- Dump created with DB migration tools ( "
-            "https://github.com/utilmind/MySQL-migration-tools )\n\n"
+            # Rebuild the fragment only if a line was actually removed.
+            if dropped:
+                enhanced = b"".join(kept_lines)
+                if not enhanced:
+                    return
+
+        out_parts.append(enhanced)
+        out_size += len(enhanced)
+        if out_size >= OUTPUT_FLUSH_SIZE:
+            flush_out()
+
+    # Without a TSV, --ddl or --no-drop the only rewrite of a plain line is the
+    # time_zone one, and that needs the line to start with SET. Every other
+    # line can then skip write_out() and go to the output buffer directly.
+    plain_copy = not table_meta and not ddl and not no_drop
+
+    # Binary mode: the scanner only looks for ASCII tokens ("/*!", "*/", ";"),
+    # which never occur inside UTF-8 multi-byte sequences, so there is no need
+    # to decode the dump on read and encode it again on write.
+    # The output is written by a background thread (see background_writer()),
+    # overlapping disk writes with the processing of the following lines.
+    with open_dump_for_reading(in_path) as fin, \
+         open(out_path, "wb", buffering=IO_BUFFER_SIZE) as fout, \
+         background_writer(fout) as write_output:
+
+        write_output(
+            b"-- Dump created with DB migration tools ( "
+            b"https://github.com/utilmind/MySQL-migration-tools )\n\n"
         )
 
         # Optionally prepend external SQL file right after the header line
@@ -699,30 +1066,71 @@ def process_dump_stream(
             sys.stderr.write(
                 "Prepending file '{0}' at the top of the dump...\n".format(prepend_file)
             )
-            with open(prepend_file, "r", encoding="utf-8", errors="replace") as pf:
-                prepend_content = pf.read()
-            if prepend_content:
-                fout.write(prepend_content)
+            # Copy it in blocks: the prepend file (e.g. a users+grants dump)
+            # may be large, so never read it into memory as a whole.
+            last_block = b""
+            with open(prepend_file, "rb") as pf:
+                while True:
+                    block = pf.read(OUTPUT_FLUSH_SIZE)
+                    if not block:
+                        break
+                    write_output(block)
+                    last_block = block
+            if last_block:
                 # Ensure the prepend block ends with a newline
-                if not prepend_content.endswith(("\n", "\r")):
-                    fout.write("\n")
-                fout.write("\n")  # extra separator after prepend block
+                if not last_block.endswith((b"\n", b"\r")):
+                    write_output(b"\n")
+                write_output(b"\n")  # extra separator after prepend block
 
         if db_name:
             # If a database name is provided, also select it explicitly.
-            fout.write("\nUSE `{0}`;\n\n".format(db_name))
+            write_output("\nUSE `{0}`;\n\n".format(db_name).encode("utf-8"))
+
+        # Runs of lines that need no processing are copied as whole blocks of
+        # up to IO_BUFFER_SIZE bytes, located with one regex search over the
+        # memory-mapped input, instead of going through the loop line by line.
+        # With a TSV or --no-drop, runs of lines that cannot open a versioned
+        # comment still go through write_out(), but as one chunk: CREATE TABLE
+        # tracking and DROP filtering work on any whole lines. Not with --ddl,
+        # as its multi-line rewrites would then see several lines at once.
+        bulk_copy = not ddl and isinstance(fin, mmap.mmap)
+        bulk_re = LINE_NEEDS_PROCESSING_RE if plain_copy else LINE_MAY_OPEN_COMMENT_RE
 
         while True:
+            if bulk_copy:
+                start = fin.tell()
+                # `start` is always the beginning of a line (0 or after "\n").
+                if start > 0:
+                    limit = min(start + IO_BUFFER_SIZE, total_size)
+                    m = bulk_re.search(fin, start - 1, limit)
+                    if m:
+                        end = m.start() + 1
+                    else:
+                        # Stop at the last complete line inside the block.
+                        end = fin.rfind(b"\n", start, limit) + 1
+                    if end > start:
+                        if plain_copy:
+                            flush_out()
+                            write_output(fin[start:end])
+                        else:
+                            write_out(fin[start:end])
+                        fin.seek(end)
+                        processed_bytes += end - start
+                        if processed_bytes >= next_progress:
+                            next_progress, last_progress_time = report_progress(
+                                processed_bytes, total_size, progress_step, last_progress_time
+                            )
+                        continue
+
             line = fin.readline()
             if not line:
                 break  # EOF
 
-            processed_bytes += len(line.encode("utf-8", errors="replace"))
-            last_percent_reported = report_progress(
-                processed_bytes,
-                total_size,
-                last_percent_reported,
-            )
+            processed_bytes += len(line)
+            if processed_bytes >= next_progress:
+                next_progress, last_progress_time = report_progress(
+                    processed_bytes, total_size, progress_step, last_progress_time
+                )
 
             # We may modify 'line' as we consume versioned comments
             pos = 0
@@ -730,37 +1138,28 @@ def process_dump_stream(
                 # Treat versioned comments only if they begin at the start of the
                 # current chunk (after leading whitespace). This avoids false
                 # positives when "/*!<digits>" appears inside INSERT payloads.
-                idx = line.find("/*!", pos)
-                if idx == -1:
-                    # No more versioned comments in this line/tail
-                    write_out(line[pos:])
-                    break
-
-                # Find the first non-whitespace character between pos and idx.
-                # If "/*!" is not at the logical beginning (after whitespace),
-                # we refuse to parse it as a versioned comment and emit the rest
-                # of the line as-is.
-                first_non_ws = None
-                scan_i = pos
-                while scan_i < len(line):
-                    ch = line[scan_i]
-                    if ch not in (" ", "\t"):
-                        first_non_ws = scan_i
-                        break
-                    scan_i += 1
-                if first_non_ws is None:
-                    # The remainder is only whitespace.
-                    write_out(line[pos:])
-                    break
-                if idx != first_non_ws:
-                    write_out(line[pos:])
+                #
+                # So only the first non-whitespace characters have to be looked
+                # at: if "/*!" is not at the logical beginning, the rest of the
+                # line is emitted as-is without searching through it (INSERT
+                # lines can be many MB long and never start with "/*!").
+                idx = LEADING_BLANKS_RE.match(line, pos).end()
+                if not line.startswith(b"/*!", idx):
+                    if plain_copy and line[idx:idx + 1] not in MAYBE_SET_LEAD_BYTES:
+                        rest = line[pos:]
+                        out_parts.append(rest)
+                        out_size += len(rest)
+                        if out_size >= OUTPUT_FLUSH_SIZE:
+                            flush_out()
+                    else:
+                        write_out(line[pos:])
                     break
 
-                # Check that we actually have digits after /*! (versioned comment)
-                j = idx + 3
-                while j < len(line) and line[j].isdigit():
-                    j += 1
-                if j == idx + 3:
+                # Check that we actually have digits after /*! (versioned comment).
+                # find_conditional_end() parses the version number only once.
+                comment = line[idx:]
+                end_pos, digits_end, version = find_conditional_end(comment)
+                if version is None:
                     # Not a "/*!<digits>" pattern; treat as normal text up to "/*!"
                     write_out(line[pos:idx + 3])
                     pos = idx + 3
@@ -768,60 +1167,64 @@ def process_dump_stream(
 
                 # We have '/*!<digits>' starting at idx.
                 # Collect the full comment block (which may span multiple lines).
-                comment = line[idx:]
-
-                while True:
-                    end_pos, digits_end = find_conditional_end(comment)
-                    if end_pos is not None:
-                        break
-
+                # Lines are collected in a list and joined only when needed, so
+                # long multi-line comments are not re-copied on every line.
+                comment_parts = [comment]
+                comment_len = len(comment)
+                if end_pos is None:
+                    # Remember how many nested comments are still open, so
+                    # that following lines are scanned only once each.
+                    _, depth = find_comment_close(comment, digits_end)
+
+                while end_pos is None:
                     # Need more data (comment not closed yet)
                     next_line = fin.readline()
                     if not next_line:
                         # EOF inside comment - just output what we have and exit
                         write_out(line[pos:idx])
-                        write_out(comment)
+                        write_out(b"".join(comment_parts))
+                        flush_out()
                         # ensure final progress
-                        last_percent_reported = report_progress(
-                            total_size,
-                            total_size,
-                            last_percent_reported,
-                        )
+                        report_progress(total_size, total_size, progress_step, last_progress_time)
                         sys.stderr.write(" done.\n")
                         sys.stderr.flush()
                         return
 
-                    processed_bytes += len(next_line.encode("utf-8", errors="replace"))
-                    last_percent_reported = report_progress(
-                        processed_bytes,
-                        total_size,
-                        last_percent_reported,
-                    )
+                    processed_bytes += len(next_line)
+                    if processed_bytes >= next_progress:
+                        next_progress, last_progress_time = report_progress(
+                            processed_bytes, total_size, progress_step, last_progress_time
+                        )
 
-                    comment += next_line
+                    comment_parts.append(next_line)
+                    line_start = comment_len
+                    comment_len += len(next_line)
 
                     # Safety cap: if we keep accumulating without finding a closing
                     # "*/", treat this as a false positive (or a malformed dump)
                     # and emit the collected text as-is.
-                    if len(comment) > MAX_COMMENT_CHARS:
+                    if comment_len > MAX_COMMENT_CHARS:
                         write_out(line[pos:idx])
-                        write_out(comment)
+                        write_out(b"".join(comment_parts))
                         # Skip further processing for this outer line; the file
                         # pointer is already advanced past the consumed lines.
-                        line = ""
+                        line = b""
                         pos = 0
                         break
 
+                    # Scan only the line just read: every previous line ends with
+                    # a newline, so no "/*" or "*/" token straddles two lines.
+                    close_pos, depth = find_comment_close(next_line, 0, depth)
+                    if close_pos is not None:
+                        end_pos = line_start + close_pos
+
                 if not line:
                     # We bailed out due to MAX_COMMENT_CHARS safety cap.
                     break
 
                 # At this point we have a full '/*!<digits> ... */' in 'comment'
-                version_str = comment[3:digits_end]
-                try:
-                    version = int(version_str)
-                except ValueError:
-                    version = 0
+                if len(comment_parts) > 1:
+                    comment = b"".join(comment_parts)
 
                 inner = comment[digits_end:end_pos]   # content inside the comment
                 tail = comment[end_pos + 2:]          # what follows after '*/' (could be ';;' etc.)
@@ -841,9 +1244,9 @@ def process_dump_stream(
                     consumed_semicolon = False
                     written_inner = inner
 
-                    if ddl and tail.startswith(";"):
+                    if ddl and tail.startswith(b";"):
                         # Move exactly one leading ';' from tail to the inner statement.
-                        if inner.rstrip().endswith(";"):
+                        if inner.rstrip().endswith(b";"):
                             # Inner already ends with ';' -> just consume one leading ';' from tail to avoid ';;'.
                             write_out(inner)
                             written_inner = inner
@@ -860,8 +1263,8 @@ def process_dump_stream(
                     # Normalize possible blank line after consuming the semicolon.
                     # mysqldump may output "*/;\n\nSET ..." (semicolon terminator plus an empty line).
                     # After consuming ';', `tail` can begin with a blank line that toggles across runs.
-                    if consumed_semicolon and written_inner.endswith("\n") and (tail.startswith("\n\n") or tail.startswith("\r\n\r\n")):
-                        tail = tail[1:] if tail.startswith("\n\n") else tail[len("\r\n"):]
+                    if consumed_semicolon and written_inner.endswith(b"\n") and (tail.startswith(b"\n\n") or tail.startswith(b"\r\n\r\n")):
+                        tail = tail[1:] if tail.startswith(b"\n\n") else tail[len(b"\r\n"):]
                 else:
                     # Keep the whole comment block as-is.
                     kept = comment[:end_pos + 2]
@@ -870,16 +1273,16 @@ def process_dump_stream(
                     # (i.e. in `tail`). If we output only '*/' and later output ';' as a standalone
                     # line, DDL sanitization may remove that line as an artifact, causing statements
                     # to collapse into a single line. Keep '*/;' together when possible.
-                    if tail.startswith(";"):
-                        kept += ";"
+                    if tail.startswith(b";"):
+                        kept += b";"
                         tail = tail[1:]  # consume exactly one ';' from tail
 
                         # Optional: normalize possible blank line after consuming ';'
                         # (mysqldump may output "*/;\n\nSET ...")
-                        if tail.startswith("\n\n"):
+                        if tail.startswith(b"\n\n"):
                             tail = tail[1:]
-                        elif tail.startswith("\r\n\r\n"):
-                            tail = tail[len("\r\n"):]
+                        elif tail.startswith(b"\r\n\r\n"):
+                            tail = tail[len(b"\r\n"):]
 
                     write_out(kept)
 
@@ -887,8 +1290,10 @@ def process_dump_stream(
                 line = tail
                 pos = 0
 
+        flush_out()
+
     # Final 100% report and newline
-    last_percent_reported = report_progress(total_size, total_size, last_percent_reported)
+    report_progress(total_size, total_size, progress_step, last_progress_time)
     sys.stderr.write(" done.\n")
     sys.stderr.flush()
 
@@ -1037,9 +1442,10 @@ def main():
 
     table_meta = {}
     default_schema = None
+    tables_by_name = None
 
     if tsv_path is not None:
-        table_meta, default_schema = load_table_metadata(tsv_path)
+        table_meta, default_schema, tables_by_name = load_table_metadata(tsv_path)
 
     process_dump_stream(
         in_path,
@@ -1047,6 +1453,7 @@ def main():
         version_threshold=version_threshold, # unwrap compatibility comments lower than specified version. (E.g 80000 = MySQL 8.0.)
         table_meta=table_meta,
         default_schema=default_schema,
+        tables_by_name=tables_by_name,
         db_name=db_name,
         no_drop=no_drop,
         prepend_file=prepend_file,
@@ -1060,13 +1467,13 @@ def main():
         try:
             # Use the whole-file pass to enforce final formatting rules
             p = Path(out_path)
-            out_text = p.read_text("utf-8", errors="replace")
+            out_text = p.read_bytes()
 
             # Apply sanitization and enforce a single trailing newline for the whole file
-            sanitized_text = sanitize_ddl_for_reproducibility(out_text).strip() + "\n"
+            sanitized_text = sanitize_ddl_for_reproducibility(out_text).strip() + b"\n"
 
             if sanitized_text != out_text:
-                p.write_text(sanitized_text, "utf-8")
+                p.write_bytes(sanitized_text)
         except Exception as e:
             sys.stderr.write("\n[WARN] Final DDL sanitization pass failed: {0}\n".format(e))
 
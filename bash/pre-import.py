@@ -52,44 +52,68 @@ Not for this script, but useful anyway
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import mmap
 import os
 import re
+import shutil
+import string
 import subprocess
 import sys
-from collections import OrderedDict
-from typing import Dict, Set, Tuple, Optional, List
+from typing import Dict, FrozenSet, Iterator, Set, Tuple, Optional, List
 
 
-# Common dump patterns:
+# Characters allowed in a collation name
+COLLATION_NAME_CHARS = string.ascii_letters + string.digits + "_"
+
+# Size of the blocks the dump is searched in (extended to the next line break),
+# and of the writes when its unchanged parts have to be copied through Python
+# (no os.copy_file_range available).
+IO_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Every collation reference contains "collat" (COLLATE, collation_connection),
+# looked up in a copy of each block with ASCII letters folded to lower case.
+COLLATION_MARKER = b"collat"
+ASCII_LOWERCASE_TABLE = bytes.maketrans(
+    string.ascii_uppercase.encode("ascii"), string.ascii_lowercase.encode("ascii")
+)
+
+# Common dump patterns (one alternation, so every line is scanned once):
 #   COLLATE=xxx
 #   COLLATE xxx
 #   SET collation_connection=xxx
-RE_COLLATE_EQ = re.compile(r"(?i)\bCOLLATE\s*=\s*([0-9A-Za-z_]+)\b")
-RE_COLLATE_WS = re.compile(r"(?i)\bCOLLATE\s+([0-9A-Za-z_]+)\b")
-RE_SET_COLLATION_CONN = re.compile(
-    r"(?i)\bSET\s+(?:@@session\.)?collation_connection\s*=\s*'?(?P<coll>[0-9A-Za-z_]+)'?\s*(?:;|\s|$)"
+# The dump is matched as raw bytes. Whitespace before the name is [^\S\r\n],
+# so a match never spans a line break, just like matching line by line.
+# A bytes \b only knows ASCII word characters, so it cannot tell where a name
+# ends in UTF-8 text. Instead, a name must not be followed by an ASCII name
+# character or any non-ASCII byte, and a keyword must not follow a non-ASCII
+# byte: "collate données" is no reference, as with the Unicode \b of a str
+# pattern. Unlike that \b, this also rejects a name followed by a non-ASCII
+# character that is not a letter, such as "€".
+RE_COLLATION_REF = re.compile(
+    rb"(?i)(?<![\x80-\xff])\bCOLLATE[^\S\r\n]*=[^\S\r\n]*(?P<eq>[0-9A-Za-z_]+)(?![0-9A-Za-z_\x80-\xff])"
+    rb"|(?<![\x80-\xff])\bCOLLATE[^\S\r\n]+(?P<ws>[0-9A-Za-z_]+)(?![0-9A-Za-z_\x80-\xff])"
+    rb"|(?<![\x80-\xff])\bSET[^\S\r\n]+(?:@@session\.)?collation_connection[^\S\r\n]*=[^\S\r\n]*'?"
+    rb"(?P<coll>[0-9A-Za-z_]+)'?\s*(?:;|\s|$)"
 )
 
 
-def collation_aliases(name: str) -> Set[str]:
+@functools.lru_cache(maxsize=None)
+def collation_aliases(name: str) -> FrozenSet[str]:
     """
     MariaDB/MySQL often consider utf8 == utf8mb3 (alias).
     Return collation "synonyms" (including itself).
+    Memoized: it is called for every supported and referenced collation.
     """
-    out = {name}
     if name.startswith("utf8_"):
-        out.add("utf8mb3_" + name[len("utf8_"):])
-    elif name.startswith("utf8mb3_"):
-        out.add("utf8_" + name[len("utf8mb3_"):])
-    return out
-
-
-def is_supported_coll(collation: str, supported: Set[str]) -> bool:
-    """True if collation (or any of its aliases) is supported by the server."""
-    return any(a in supported for a in collation_aliases(collation))
+        return frozenset((name, "utf8mb3_" + name[len("utf8_"):]))
+    if name.startswith("utf8mb3_"):
+        return frozenset((name, "utf8_" + name[len("utf8mb3_"):]))
+    return frozenset((name,))
 
 
+@functools.lru_cache(maxsize=None)
 def canonical_charset_from_collation(coll: str) -> str:
     """
     Get charset-prefix from collation name until the first '_', then normalize:
@@ -101,17 +125,20 @@ def canonical_charset_from_collation(coll: str) -> str:
     return base
 
 
-def load_mapping(path: str) -> "OrderedDict[str, str]":
-    if not os.path.exists(path):
-        return OrderedDict()
-    with open(path, "r", encoding="utf-8") as f:
-        raw = f.read().strip()
-    if not raw:
-        return OrderedDict()
-    data = json.loads(raw, object_pairs_hook=OrderedDict)
+def load_mapping(path: str) -> Dict[str, str]:
+    # json.loads() takes the raw bytes (UTF-8, with or without BOM) directly,
+    # so the file is neither decoded nor stripped into another copy first.
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return {}
+    if not raw or raw.isspace():
+        return {}
+    data = json.loads(raw)
     if not isinstance(data, dict):
         raise SystemExit(f"ERROR: Mapping file must contain a JSON object: {path}")
-    out: "OrderedDict[str, str]" = OrderedDict()
+    out: Dict[str, str] = {}
     for k, v in data.items():
         if not isinstance(k, str):
             raise SystemExit(f"ERROR: Mapping key must be a string, got: {k!r}")
@@ -123,12 +150,24 @@ def load_mapping(path: str) -> "OrderedDict[str, str]":
     return out
 
 
-def save_mapping(path: str, mapping: "OrderedDict[str, str]") -> None:
+def save_mapping(path: str, mapping: Dict[str, str]) -> None:
+    # Pretty JSON: one key-value per line
+    data = (json.dumps(mapping, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+    # Leave an already-canonical file (and its mtime) untouched.
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return
+    except FileNotFoundError:
+        pass
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, "w", encoding="utf-8", newline="\n") as f:
-        # Pretty JSON: one key-value per line
-        json.dump(mapping, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def is_collation_name(name: str) -> bool:
+    """True if name is a non-empty run of [0-9A-Za-z_] (checked without the regex engine)."""
+    return bool(name) and not name.strip(COLLATION_NAME_CHARS)
 
 
 def load_target_collations_from_file(path: str) -> Set[str]:
@@ -145,7 +184,7 @@ def load_target_collations_from_file(path: str) -> Set[str]:
                 continue
             # first token
             name = re.split(r"[\s\t|]+", s)[0].strip()
-            if re.fullmatch(r"[0-9A-Za-z_]+", name):
+            if is_collation_name(name):
                 out.add(name)
     return out
 
@@ -173,7 +212,7 @@ def load_target_collations_via_mysql(mysql_command: str) -> Set[str]:
     out: Set[str] = set()
     for line in proc.stdout.splitlines():
         name = line.strip()
-        if re.fullmatch(r"[0-9A-Za-z_]+", name):
+        if is_collation_name(name):
             out.add(name)
     if not out:
         raise SystemExit(
@@ -183,48 +222,121 @@ def load_target_collations_via_mysql(mysql_command: str) -> Set[str]:
     return out
 
 
+def map_dump(f) -> Optional[mmap.mmap]:
+    """
+    Memory-map an open dump file read-only, hinting sequential access so the
+    kernel reads ahead aggressively. Returns None for an empty file, which
+    cannot be mapped (and has nothing to scan), and for a file that cannot be
+    mapped at all (e.g. a multi-GB dump in a 32-bit Python): callers then
+    read the file itself (see iter_dump_blocks()).
+    """
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OverflowError, OSError):
+        return None
+    if hasattr(mmap, "MADV_SEQUENTIAL"):  # Python 3.8+, not on Windows
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    return mm
+
+
+def iter_dump_blocks(f, mm: Optional[mmap.mmap]) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (offset, block) pairs covering the whole dump, in order. Blocks are
+    about IO_CHUNK_SIZE long and end at a line break (or at the end of the
+    file), so no line is split between two blocks. They are sliced from the
+    mapping `mm`, or read from the file `f` when it could not be mapped.
+    """
+    pos = 0
+    if mm is not None:
+        size = len(mm)
+        while pos < size:
+            end = mm.find(b"\n", min(pos + IO_CHUNK_SIZE, size))
+            end = size if end < 0 else end + 1
+            yield pos, mm[pos:end]
+            pos = end
+        return
+
+    buf = bytearray()
+    while True:
+        data = f.read(IO_CHUNK_SIZE)
+        if data:
+            buf += data
+            # Only the new data can hold the last line break of the buffer.
+            cut = buf.rfind(b"\n", len(buf) - len(data)) + 1
+        else:
+            cut = len(buf)
+        if cut:
+            yield pos, bytes(buf[:cut])
+            del buf[:cut]
+            pos += cut
+        if not data:
+            return
+
+
+def iter_collation_lines(block: bytes) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, end) offsets of the lines of a dump block (see
+    iter_dump_blocks()) that contain COLLATION_MARKER in any letter case,
+    end including the line break.
+
+    No collation pattern matches across a line break, so the regexes only have
+    to run on these few lines. Finding them is a bytes.find() over a lowercased
+    copy of the block, which is far cheaper than a case-insensitive regex
+    search through gigabytes of INSERT data.
+    """
+    lower = block.translate(ASCII_LOWERCASE_TABLE)
+    i = lower.find(COLLATION_MARKER)
+    while i >= 0:
+        line_start = lower.rfind(b"\n", 0, i) + 1
+        line_end = lower.find(b"\n", i) + 1 or len(lower)
+        yield line_start, line_end
+        i = lower.find(COLLATION_MARKER, line_end)
+
+
 def scan_dump_for_collations(path: str) -> Set[str]:
     """
     Scan a dump file and collect all referenced collations.
-    Line-by-line scanning avoids false negatives caused by chunk boundary splits.
+    The file is memory-mapped where possible and only the lines that can hold
+    a collation reference (see iter_collation_lines()) are matched against the pattern.
     """
     found: Set[str] = set()
 
-    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
-        for line in f:
-            # COLLATE=xxx
-            for m in RE_COLLATE_EQ.finditer(line):
-                found.add(m.group(1))
-
-            # COLLATE xxx
-            for m in RE_COLLATE_WS.finditer(line):
-                found.add(m.group(1))
-
-            # SET collation_connection=xxx (and variants)
-            for m in RE_SET_COLLATION_CONN.finditer(line):
-                found.add(m.group("coll"))
+    with open(path, "rb") as f:
+        mm = map_dump(f)
+        try:
+            for _, block in iter_dump_blocks(f, mm):
+                for start, end in iter_collation_lines(block):
+                    for m in RE_COLLATION_REF.finditer(block, start, end):
+                        found.add(m.group(m.lastgroup).decode("ascii"))
+        finally:
+            if mm is not None:
+                mm.close()
 
     return found
 
 
 def build_replacements(
-    referenced: Set[str],
+    referenced: List[str],
     supported: Set[str],
-    mapping: "OrderedDict[str, str]",
+    mapping: Dict[str, str],
     allow_charset_change: bool = False,
-) -> Tuple[Dict[str, str], Set[str], Dict[str, str]]:
+) -> Tuple[Dict[str, str], List[str], Dict[str, str]]:
     """
+    `referenced` is expected in sorted order; all results keep that order, so
+    callers can print or save them without sorting again.
+
     Returns:
       replacements: unsupported->mapped_to (only where mapped_to non-empty)
       missing: unsupported collations with no mapping or empty mapping
       invalid_targets: mapping points to a collation not supported by target OR violates charset safety
+
+    `supported` must already include the utf8 <-> utf8mb3 aliases (see main()),
+    so a collation is supported exactly when it is a member of the set.
     """
     replacements: Dict[str, str] = {}
-    missing: Set[str] = set()
+    missing: List[str] = []
     invalid_targets: Dict[str, str] = {}
 
-    is_supported = lambda c: is_supported_coll(c, supported)
-
     def best_supported_name(coll: str) -> str:
         # If exact exists, keep it; otherwise if an alias exists, use the one that exists.
         if coll in supported:
@@ -234,14 +346,14 @@ def build_replacements(
                 return alt
         return coll  # fallback (will be reported invalid by caller)
 
-    for c in sorted(referenced):
-        if is_supported(c):
+    for c in referenced:
+        if c in supported:
             continue
 
         mapped_raw = mapping.get(c, "")
         mapped = mapped_raw.strip()
         if not mapped:
-            missing.add(c)
+            missing.append(c)
             continue
 
         # Charset safety: do NOT allow mapping across different charset families by default.
@@ -254,7 +366,7 @@ def build_replacements(
             continue
 
         # Validate mapped collation exists (or alias exists) on target
-        if not is_supported(mapped):
+        if mapped not in supported:
             invalid_targets[c] = mapped
             continue
 
@@ -263,54 +375,107 @@ def build_replacements(
     return replacements, missing, invalid_targets
 
 
+@functools.lru_cache(maxsize=32)
+def build_replacement_pattern(
+    items: Tuple[Tuple[str, str], ...],
+) -> Tuple["re.Pattern[bytes]", Dict[bytes, bytes]]:
+    """
+    Compile one pattern for all source collations, rewritten in a single pass:
+      COLLATE xyz / DEFAULT COLLATE=xyz  (followed by end, space or ,;)])
+      SET collation_connection=xyz       (followed by optional quote, then ; space or end)
+    `items` are the (source, target) pairs sorted by source; the result is cached,
+    so a wrapper processing many dumps with the same mapping compiles it once.
+
+    Returns (pattern, targets). Matching is case-insensitive, so targets is keyed
+    by lowercased name; if several sources differ only by case, the first wins.
+    """
+    targets: Dict[bytes, bytes] = {}
+    for src, dst in items:
+        targets.setdefault(src.encode("utf-8").lower(), dst.encode("utf-8"))
+
+    names = b"|".join(re.escape(src.encode("utf-8")) for src, _ in items)
+    pattern = re.compile(
+        rb"(?i)(?<![\x80-\xff])(?:\bCOLLATE[^\S\r\n]*=[^\S\r\n]*|\bCOLLATE[^\S\r\n]+"
+        rb"|(?P<set>\bSET[^\S\r\n]+(?:@@session\.)?collation_connection[^\S\r\n]*=[^\S\r\n]*'?))"
+        rb"(?P<src>" + names + rb")"
+        rb"(?(set)(?='?\s*(?:;|\s|$))|(?=$|[\s,;\)\]]))"
+    )
+    return pattern, targets
+
+
 def apply_replacements_stream(
     input_path: str,
     output_path: str,
     replacements: Dict[str, str],
 ) -> None:
     """
-    Apply replacements to a dump, streaming line-by-line to avoid chunk-boundary issues.
+    Apply replacements to a dump. The file is memory-mapped where possible and
+    only the lines that can hold a collation reference are searched; the bytes
+    between matches are copied to the output without passing through Python
+    where the OS allows it.
     """
-    subs: List[Tuple[re.Pattern, str]] = []
-
-    for src in sorted(replacements):
-        dst = replacements[src]
-        # COLLATE xyz
-        subs.append(
-            (
-                re.compile(rf"(?i)(\bCOLLATE\s+)" + re.escape(src) + r"(?=($|[\s,;\)\]]))"),
-                r"\1" + dst
-            )
-        )
-        # DEFAULT COLLATE=xyz
-        subs.append(
-            (
-                re.compile(rf"(?i)(\bCOLLATE\s*=\s*)" + re.escape(src) + r"(?=($|[\s,;\)\]]))"),
-                r"\1" + dst
-            )
-        )
-        # SET collation_connection=xyz
-        subs.append(
-            (
-                re.compile(
-                    rf"(?i)(\bSET\s+(?:@@session\.)?collation_connection\s*=\s*'?)"
-                    + re.escape(src)
-                    + r"('?\s*(?:;|\s|$))"
-                ),
-                r"\1" + dst + r"\2",
-            )
-        )
-
     os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
 
-    with open(input_path, "r", encoding="utf-8", errors="replace", newline="") as fin, \
-         open(output_path, "w", encoding="utf-8", errors="replace", newline="\n") as fout:
-
-        for line in fin:
-            new_line = line
-            for pat, repl in subs:
-                new_line = pat.sub(repl, new_line)
-            fout.write(new_line)
+    if not replacements:
+        # Nothing to rewrite: a plain file copy (done by the kernel on Linux).
+        shutil.copyfile(input_path, output_path)
+        return
+
+    pattern, targets = build_replacement_pattern(tuple(sorted(replacements.items())))
+
+    # Binary I/O: only the ASCII collation names are touched, every other byte
+    # of the dump (including invalid UTF-8 in BLOB literals) is copied as is.
+    # The output is unbuffered: the spans between matches are copied from the
+    # input file by the kernel, and both kinds of writes share the fd position.
+    with open(input_path, "rb") as fin, open(output_path, "wb", buffering=0) as fout:
+        mm = map_dump(fin)
+        try:
+            in_fd = fin.fileno()
+            out_fd = fout.fileno()
+            use_copy_file_range = hasattr(os, "copy_file_range")  # Linux, Python 3.8+
+            if hasattr(os, "posix_fadvise"):  # not on Windows/macOS
+                # copy_file_range() reads the file through the fd, not through
+                # the mapping, so hint sequential read-ahead for the fd as well.
+                os.posix_fadvise(in_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+            def write_all(data) -> None:
+                # fout is unbuffered, so a single write() may take only part of data.
+                view = memoryview(data)
+                while view:
+                    view = view[fout.write(view):]
+
+            def copy_span(block: bytes, offset: int, start: int, end: int) -> None:
+                """Copy block[start:end] (found at `offset` in the input) to the output."""
+                nonlocal use_copy_file_range
+                while use_copy_file_range and start < end:
+                    try:
+                        copied = os.copy_file_range(in_fd, out_fd, end - start, offset + start)
+                    except OSError:
+                        # Not supported for these files (e.g. cross-device
+                        # on older kernels): fall back to plain writes.
+                        copied = 0
+                    if not copied:
+                        use_copy_file_range = False
+                    start += copied
+                if start < end:
+                    write_all(memoryview(block)[start:end])
+
+            for offset, block in iter_dump_blocks(fin, mm):
+                pos = 0
+                for start, end in iter_collation_lines(block):
+                    for m in pattern.finditer(block, start, end):
+                        copy_span(block, offset, pos, m.start("src"))
+                        write_all(targets[m.group("src").lower()])
+                        pos = m.end()
+                copy_span(block, offset, pos, len(block))
+
+            if hasattr(os, "posix_fadvise"):
+                # The input is not read again after this pass: let the kernel
+                # drop its pages instead of evicting more useful cache.
+                os.posix_fadvise(in_fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            if mm is not None:
+                mm.close()
 
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -371,12 +536,13 @@ def main(argv: Optional[List[str]] = None) -> int:
         supported_expanded |= collation_aliases(c)
     supported = supported_expanded
 
-    referenced = scan_dump_for_collations(args.input)
-    unsupported = {c for c in referenced if not is_supported_coll(c, supported)}
+    # Sorted once here; everything derived from it below keeps this order.
+    referenced = sorted(scan_dump_for_collations(args.input))
+    unsupported = [c for c in referenced if c not in supported]
 
     # Ensure every unsupported collation appears in mapping (even if empty)
     mapping_changed = False
-    for c in sorted(unsupported):
+    for c in unsupported:
         if c not in mapping:
             mapping[c] = ""
             mapping_changed = True
@@ -394,7 +560,7 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     if invalid_targets:
         print("ERROR: Mapping points to collations NOT supported by the target server:", file=sys.stderr)
-        for src, dst in sorted(invalid_targets.items()):
+        for src, dst in invalid_targets.items():
             print(f"  {src} -> {dst}", file=sys.stderr)
         print("Please fix the mapping file and rerun.", file=sys.stderr)
         return 2
@@ -405,7 +571,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             # still rewrite to keep formatting consistent if file existed but was messy
             save_mapping(args.map_file, mapping)
 
-        missing_list = "\n".join(f"\t{c}" for c in sorted(missing))
+        missing_list = "\n".join(f"\t{c}" for c in missing)
         print(
             "Not all collations can be auto-replaced.\n\n"
             "Found collations in the dump that are NOT supported by the target server, "
@@ -418,16 +584,16 @@ def main(argv: Optional[List[str]] = None) -> int:
         )
         if args.show_summary:
             print(f"Missing mappings ({len(missing)}):", file=sys.stderr)
-            for c in sorted(missing):
+            for c in missing:
                 print(f"  - {c}", file=sys.stderr)
 
         if args.report:
             rep = {
-                "referenced_collations": sorted(referenced),
-                "unsupported_collations": sorted(unsupported),
-                "replacements": dict(sorted(replacements.items())),
-                "missing_mappings": sorted(missing),
-                "invalid_mapping_targets": dict(sorted(invalid_targets.items())),
+                "referenced_collations": referenced,
+                "unsupported_collations": unsupported,
+                "replacements": replacements,
+                "missing_mappings": missing,
+                "invalid_mapping_targets": invalid_targets,
                 "target_supported_collations_count": len(supported),
             }
             os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
@@ -443,7 +609,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             print(f"Referenced collations: {len(referenced)}")
             print(f"Unsupported collations: {len(unsupported)}")
             print(f"Replacements planned: {len(replacements)}")
-            for s, d in sorted(replacements.items()):
+            for s, d in replacements.items():
                 print(f"  {s} -> {d}")
         return 0
 
@@ -454,14 +620,14 @@ def main(argv: Optional[List[str]] = None) -> int:
         print(f"Referenced collations: {len(referenced)}")
         print(f"Unsupported collations: {len(unsupported)}")
         print(f"Replacements applied: {len(replacements)}")
-        for s, d in sorted(replacements.items()):
+        for s, d in replacements.items():
             print(f"  {s} -> {d}")
 
     if args.report:
         rep = {
-            "referenced_collations": sorted(referenced),
-            "unsupported_collations": sorted(unsupported),
-            "replacements": dict(sorted(replacements.items())),
+            "referenced_collations": referenced,
+            "unsupported_collations": unsupported,
+            "replacements": replacements,
             "missing_mappings": [],
             "invalid_mapping_targets": {},
             "target_supported_collations_count": len(supported),
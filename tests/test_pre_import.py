@@ -0,0 +1,69 @@
+"""
+Regression tests for bash/pre-import.py.
+
+Run from the repository root:
+
+    python -m unittest discover -s tests
+"""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(__file__), os.pardir, "bash", "pre-import.py")
+
+# The script name has a hyphen, so it cannot be imported by name.
+_spec = importlib.util.spec_from_file_location("pre_import", SCRIPT)
+pre_import = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(pre_import)
+
+
+class NonAsciiAfterNameTest(unittest.TestCase):
+    """
+    A collation name directly followed by a non-ASCII letter, or a keyword
+    directly preceded by one, is no reference.
+    """
+
+    DUMP = (
+        "CREATE TABLE `t` (\n"
+        "  `a` varchar(10) COLLATE utf8_general_ci,\n"
+        "  `b` varchar(10) COLLATE utf8mb4_binñ\n"
+        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8_unicode_ci;\n"
+        "INSERT INTO `t` VALUES ('collate données','COLLATE=latin1_swedish_ciä',"
+        "'déjàCOLLATE latin1_bin');\n"
+    ).encode("utf-8")
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sql")
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.DUMP)
+        self.addCleanup(os.remove, self.path)
+
+    def test_scan(self):
+        self.assertEqual(
+            pre_import.scan_dump_for_collations(self.path),
+            {"utf8_general_ci", "utf8_unicode_ci"},
+        )
+
+    def test_rewrite(self):
+        out_path = self.path + ".out"
+        self.addCleanup(os.remove, out_path)
+        pre_import.apply_replacements_stream(
+            self.path,
+            out_path,
+            {
+                "utf8_general_ci": "utf8mb3_general_ci",
+                "utf8mb4_bin": "utf8mb4_0900_bin",
+                "latin1_bin": "latin1_general_ci",
+            },
+        )
+        with open(out_path, "rb") as f:
+            out = f.read()
+        self.assertEqual(
+            out, self.DUMP.replace(b"utf8_general_ci", b"utf8mb3_general_ci")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()